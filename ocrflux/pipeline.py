@@ -851,6 +851,7 @@ async def main():
 
     # Wait for all worker tasks to finish
     await asyncio.gather(*worker_tasks)
+    work_queue.close()
 
     vllm_server.cancel()
     metrics_task.cancel()
@@ -1,19 +1,32 @@
 import abc
 import asyncio
-import datetime
+import concurrent.futures
 import hashlib
+import io
 import logging
+import mmap
 import os
 import random
-from asyncio import Queue
-from dataclasses import dataclass
-from typing import Any, List, Optional
+import struct
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Size in bytes of a raw SHA1 digest, as stored in the done set file
+DIGEST_SIZE = hashlib.sha1().digest_size
 
-@dataclass
-class WorkItem:
+# Completed work is written to results/output_{hash}.jsonl, where hash is a hex SHA1 digest
+RESULT_PREFIX = "output_"
+RESULT_SUFFIX = ".jsonl"
+RESULT_PREFIX_LEN = len(RESULT_PREFIX)
+RESULT_SUFFIX_LEN = len(RESULT_SUFFIX)
+RESULT_NAME_LENGTH = RESULT_PREFIX_LEN + 2 * DIGEST_SIZE + RESULT_SUFFIX_LEN
+
+
+class WorkItem(NamedTuple):
     """Represents a single work item in the queue"""
 
     hash: str
@@ -92,6 +105,12 @@ class WorkQueue(abc.ABC):
         """Get current size of work queue"""
         pass
 
+    def close(self) -> None:
+        """
+        Release any resources held by the queue, such as worker threads.
+        """
+        pass
+
     @staticmethod
     def _compute_workgroup_hash(work_paths: List[str]) -> str:
         """
@@ -103,14 +122,26 @@ class WorkQueue(abc.ABC):
         Returns:
             SHA1 hash of the sorted paths
         """
-        sha1 = hashlib.sha1()
-        for path in sorted(work_paths):
-            sha1.update(path.encode("utf-8"))
-        return sha1.hexdigest()
+        return WorkQueue._compute_sorted_workgroup_hash(sorted(work_paths))
+
+    @staticmethod
+    def _compute_sorted_workgroup_hash(sorted_paths: List[str]) -> str:
+        """
+        Same as _compute_workgroup_hash, for paths that are already sorted.
+
+        Args:
+            sorted_paths: List of paths (local or S3), in sorted order
+
+        Returns:
+            SHA1 hash of the paths
+        """
+        # Hashing the concatenation in one call gives the same digest as updating per path
+        joined = "".join(sorted_paths).encode("utf-8")
+        return hashlib.sha1(joined, usedforsecurity=False).hexdigest()
 
 
 # --------------------------------------------------------------------------------------
-# Local Helpers for reading/writing the index CSV (compressed with zstd) to disk
+# Local Helpers for reading/writing the binary work index (compressed with zstd) to disk
 # --------------------------------------------------------------------------------------
 
 try:
@@ -119,40 +150,140 @@ except ImportError:
     zstandard = None
 
 
-def download_zstd_csv_local(local_path: str) -> List[str]:
+# Each index record is one zstd frame, prefixed by its compressed and decompressed sizes
+INDEX_RECORD_HEADER = struct.Struct("<QQ")
+
+# Inside a record, each work group is its raw SHA1 digest and the byte length of its paths,
+# followed by the UTF-8 paths joined with NUL, which cannot occur in a path
+GROUP_HEADER = struct.Struct(f"<{DIGEST_SIZE}sI")
+PATH_SEPARATOR = "\0"
+
+# Target size of the zstd dictionary trained on index groups, and how many groups to train it on
+INDEX_DICT_SIZE = 16384
+INDEX_DICT_SAMPLES = 1000
+
+
+def pack_work_group(group_hash: str, work_paths: List[str]) -> bytes:
+    """
+    Serialize a single work group into the binary index format.
+    """
+    joined = PATH_SEPARATOR.join(work_paths)
+    if joined.count(PATH_SEPARATOR) != len(work_paths) - 1:
+        raise ValueError(f"Work paths of group {group_hash} must not contain NUL characters")
+    encoded = joined.encode("utf-8")
+    return GROUP_HEADER.pack(bytes.fromhex(group_hash), len(encoded)) + encoded
+
+
+def unpack_work_group(packed_group: bytes) -> Tuple[str, List[str]]:
+    """
+    Deserialize a single work group packed with pack_work_group into (hash, work_paths).
+    """
+    digest, length = GROUP_HEADER.unpack_from(packed_group)
+    start = GROUP_HEADER.size
+    # Decode and split all paths of the group in two C-level calls
+    return digest.hex(), str(memoryview(packed_group)[start : start + length], "utf-8").split(PATH_SEPARATOR)
+
+
+def iter_packed_work_groups(data: bytes) -> Iterator[Tuple[bytes, memoryview]]:
+    """
+    Iterate over the (digest, packed_group) of each group serialized back to back in data,
+    without decoding its paths. Each packed_group is a view into data, not a copy.
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        digest, length = GROUP_HEADER.unpack_from(view, offset)
+        end = offset + GROUP_HEADER.size + length
+        yield digest, view[offset:end]
+        offset = end
+
+
+def unpack_work_groups(data: bytes) -> Iterator[Tuple[str, List[str]]]:
     """
-    Download a zstd-compressed CSV from a local path.
-    If the file doesn't exist, returns an empty list.
+    Iterate over the (hash, work_paths) groups serialized back to back in data.
+    """
+    for _, packed_group in iter_packed_work_groups(data):
+        yield unpack_work_group(packed_group)
+
+
+def iter_zstd_index_records_local(
+    local_path: str, dict_data: Optional["zstandard.ZstdCompressionDict"] = None
+) -> Iterator[bytes]:
+    """
+    Lazily iterate over the decompressed records of a zstd-compressed binary index at a local path.
+    The file holds one size-prefixed zstd record per append, so each record
+    is decompressed in one shot into a buffer of the known size.
+    If the file doesn't exist, nothing is yielded.
     """
     if not os.path.exists(local_path):
-        return []
+        return
 
     if not zstandard:
-        raise RuntimeError("zstandard package is required for local zstd CSV operations.")
+        raise RuntimeError("zstandard package is required for local zstd index operations.")
 
+    dctx = zstandard.ZstdDecompressor(dict_data=dict_data)
     with open(local_path, "rb") as f:
-        dctx = zstandard.ZstdDecompressor()
-        data = dctx.decompress(f.read())
-    lines = data.decode("utf-8").splitlines()
-    return lines
+        while header := f.read(INDEX_RECORD_HEADER.size):
+            if len(header) < INDEX_RECORD_HEADER.size:
+                raise ValueError(f"Truncated record header in {local_path}")
+            compressed_size, decompressed_size = INDEX_RECORD_HEADER.unpack(header)
+            frame = f.read(compressed_size)
+            if len(frame) < compressed_size:
+                raise ValueError(f"Truncated record in {local_path}")
 
+            yield dctx.decompress(frame, max_output_size=decompressed_size)
 
-def upload_zstd_csv_local(local_path: str, lines: List[str]) -> None:
+
+def iter_zstd_index_local(
+    local_path: str, dict_data: Optional["zstandard.ZstdCompressionDict"] = None
+) -> Iterator[Tuple[str, List[str]]]:
     """
-    Upload a zstd-compressed CSV to a local path.
+    Lazily iterate over the (hash, work_paths) groups of a zstd-compressed binary index at a local path.
+    If the file doesn't exist, nothing is yielded.
     """
-    if not zstandard:
-        raise RuntimeError("zstandard package is required for local zstd CSV operations.")
+    for data in iter_zstd_index_records_local(local_path, dict_data):
+        yield from unpack_work_groups(data)
 
-    data = "\n".join(lines).encode("utf-8")
-    cctx = zstandard.ZstdCompressor()
-    compressed_data = cctx.compress(data)
+
+def append_zstd_index_local(
+    local_path: str, packed_groups: List[bytes], dict_data: Optional["zstandard.ZstdCompressionDict"] = None
+) -> None:
+    """
+    Append work groups, already serialized with pack_work_group, to a zstd-compressed binary index at a local path.
+
+    The groups are compressed into a new, independent size-prefixed record which is
+    appended to the file, so existing groups are never rewritten.
+    """
+    if not zstandard:
+        raise RuntimeError("zstandard package is required for local zstd index operations.")
 
     # Ensure parent directories exist
     os.makedirs(os.path.dirname(local_path), exist_ok=True)
 
-    with open(local_path, "wb") as f:
-        f.write(compressed_data)
+    data = b"".join(packed_groups)
+    cctx = zstandard.ZstdCompressor(dict_data=dict_data)
+    compressed_data = cctx.compress(data)
+
+    # Write header and frame in one call so a record is never split across appends
+    with open(local_path, "ab") as f:
+        f.write(INDEX_RECORD_HEADER.pack(len(compressed_data), len(data)) + compressed_data)
+
+
+def iter_zstd_csv_local(local_path: str) -> Iterator[str]:
+    """
+    Lazily iterate over the non-empty lines of a zstd-compressed CSV at a local path.
+    This is the index format of earlier versions, which is only read to migrate it.
+    """
+    if not zstandard:
+        raise RuntimeError("zstandard package is required for local zstd CSV operations.")
+
+    with open(local_path, "rb") as f:
+        dctx = zstandard.ZstdDecompressor()
+        with dctx.stream_reader(f, read_across_frames=True) as reader:
+            for line in io.TextIOWrapper(reader, encoding="utf-8", newline="\n"):
+                line = line.strip()
+                if line:
+                    yield line
 
 
 # --------------------------------------------------------------------------------------
@@ -165,6 +296,10 @@ class LocalWorkQueue(WorkQueue):
     A local in-memory and on-disk WorkQueue implementation, which uses
     a local workspace directory to store the queue index, lock files,
     and completed results for persistent resumption across process restarts.
+
+    Completed items are tracked in done.sha1set, which initialize_queue reads
+    instead of listing results/. To re-run an item whose results/output_{hash}.jsonl
+    was deleted, delete done.sha1set as well; it is rebuilt from results/ on the next start.
     """
 
     def __init__(self, workspace_path: str):
@@ -179,7 +314,13 @@ class LocalWorkQueue(WorkQueue):
         os.makedirs(self.workspace_path, exist_ok=True)
 
         # Local index file (compressed)
-        self._index_path = os.path.join(self.workspace_path, "work_index_list.csv.zstd")
+        self._index_path = os.path.join(self.workspace_path, "work_index.bin.zstd")
+
+        # CSV index written by earlier versions, migrated into the binary index on first use
+        self._legacy_index_path = os.path.join(self.workspace_path, "work_index_list.csv.zstd")
+
+        # Zstd dictionary shared by all index records, trained on the first groups written
+        self._index_dict_path = os.path.join(self.workspace_path, "index.zdict")
 
         # Output directory for completed tasks
         self._results_dir = os.path.join(self.workspace_path, "results")
@@ -189,8 +330,190 @@ class LocalWorkQueue(WorkQueue):
         self._locks_dir = os.path.join(self.workspace_path, "worker_locks")
         os.makedirs(self._locks_dir, exist_ok=True)
 
-        # Internal queue
-        self._queue: Queue[Any] = Queue()
+        # Append-only file of raw SHA1 digests of completed work items
+        self._done_set_path = os.path.join(self.workspace_path, "done.sha1set")
+
+        # Internal queue of work groups, still packed in the binary index format,
+        # the WorkItem for an entry is only built when get_work hands it out.
+        # Nothing ever awaits on it, so a plain deque is used instead of an asyncio.Queue
+        self._queue: Deque[bytes] = deque()
+
+        # Dedicated threads for the lock and done set file operations of get_work and mark_done,
+        # so a slow (e.g. networked) filesystem does not stall the event loop or the default executor.
+        # Created on first use and shut down by close()
+        self._io_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def _get_io_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Get the I/O thread pool, creating it if needed"""
+        if self._io_pool is None:
+            self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="wq-io")
+        return self._io_pool
+
+    def close(self) -> None:
+        """
+        Shut down the I/O thread pool, waiting for pending lock file operations.
+        The queue stays usable, the pool is created again if needed.
+        """
+        if self._io_pool is not None:
+            self._io_pool.shutdown()
+            self._io_pool = None
+
+    def _load_index_dict(self) -> Optional["zstandard.ZstdCompressionDict"]:
+        """Load the zstd dictionary for the local index, if one has been trained"""
+        if not zstandard:
+            raise RuntimeError("zstandard package is required for local zstd index operations.")
+
+        if not os.path.exists(self._index_dict_path):
+            return None
+        with open(self._index_dict_path, "rb") as f:
+            return zstandard.ZstdCompressionDict(f.read())
+
+    def _migrate_legacy_index(self) -> None:
+        """
+        Convert a CSV index left by an earlier version into the binary index, once.
+        The CSV file is left in place, it is no longer read once the binary index exists.
+        """
+        if os.path.exists(self._index_path) or not os.path.exists(self._legacy_index_path):
+            return
+        if not zstandard:
+            raise RuntimeError("zstandard package is required to migrate the legacy work index.")
+
+        try:
+            lines = list(iter_zstd_csv_local(self._legacy_index_path))
+        except zstandard.ZstdError as e:
+            raise RuntimeError(f"Could not read legacy work index {self._legacy_index_path}: {e}") from e
+        groups = [(parts[0], parts[1:]) for parts in (line.split(",") for line in lines)]
+        logger.info(f"Migrating {len(groups):,} work groups from {self._legacy_index_path}")
+        if not groups:
+            return
+
+        packed_groups = [pack_work_group(group_hash, group_paths) for group_hash, group_paths in groups]
+        dict_data = self._load_index_dict()
+        if dict_data is None:
+            dict_data = self._train_index_dict(packed_groups)
+
+        # Build the binary index privately and link it into place, so concurrent migrations write it only once
+        tmp_path = f"{self._index_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            append_zstd_index_local(tmp_path, packed_groups, dict_data)
+            os.link(tmp_path, self._index_path)
+        except FileExistsError:
+            logger.debug("Legacy work index was migrated concurrently")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _discard_existing_paths(self, paths: Set[str]) -> Set[str]:
+        """
+        Stream the local index and remove every path it already contains from paths, in place.
+        The index's own paths are never collected into a set of their own.
+        """
+        for _, group_paths in iter_zstd_index_local(self._index_path, self._load_index_dict()):
+            paths.difference_update(group_paths)
+        return paths
+
+    def _read_work_index(self) -> Dict[bytes, memoryview]:
+        """Stream the local index into a mapping of group digest to its packed group, leaving paths undecoded"""
+        return {
+            digest: packed_group
+            for data in iter_zstd_index_records_local(self._index_path, self._load_index_dict())
+            for digest, packed_group in iter_packed_work_groups(data)
+        }
+
+    def _append_work_index(self, groups: List[Tuple[str, List[str]]]) -> None:
+        """
+        Append work groups to the local index, training the index dictionary from them first if there is none yet.
+        Records written before the dictionary existed still decode, since they do not reference it.
+        """
+        packed_groups = [pack_work_group(group_hash, group_paths) for group_hash, group_paths in groups]
+
+        dict_data = self._load_index_dict()
+        if dict_data is None and zstandard:
+            dict_data = self._train_index_dict(packed_groups)
+
+        append_zstd_index_local(self._index_path, packed_groups, dict_data)
+
+    def _train_index_dict(self, packed_groups: List[bytes]) -> Optional["zstandard.ZstdCompressionDict"]:
+        """
+        Train the index dictionary from packed work groups and publish it, unless another process published one first.
+
+        Returns:
+            The dictionary that is now stored for the workspace, or None if there were too few groups to train on
+        """
+        samples = random.sample(packed_groups, min(len(packed_groups), INDEX_DICT_SAMPLES))
+        try:
+            dict_data = zstandard.train_dictionary(INDEX_DICT_SIZE, samples)
+        except zstandard.ZstdError as e:
+            # Too few groups to train on, try again with the next batch
+            logger.debug(f"Not training index dictionary from {len(samples)} groups: {e}")
+            return None
+
+        # Write the dictionary in full to a private file, then link it into place. The link fails if
+        # the dictionary already exists, so a published dictionary is never overwritten or seen half written
+        tmp_path = f"{self._index_dict_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(dict_data.as_bytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp_path, self._index_dict_path)
+        except FileExistsError:
+            # Another process published its dictionary first, records must be compressed with that one
+            logger.debug("Index dictionary was trained concurrently, using the published one")
+            return self._load_index_dict()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return dict_data
+
+    def _read_done_digests(self) -> Set[bytes]:
+        """
+        Load the digests of completed work items from the done set file.
+
+        If the done set file is missing, it is rebuilt by scanning results/*.jsonl once.
+        Items finished after that are appended to it by mark_done. Deleting a result file
+        does not remove its digest, the done set has to be deleted too for the item to be re-queued.
+        """
+        if os.path.exists(self._done_set_path):
+            with open(self._done_set_path, "rb") as f:
+                # Ignore a trailing partial digest left by an interrupted write
+                size = os.fstat(f.fileno()).st_size
+                size -= size % DIGEST_SIZE
+                if size == 0:
+                    return set()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return {mm[i : i + DIGEST_SIZE] for i in range(0, size, DIGEST_SIZE)}
+
+        if not os.path.isdir(self._results_dir):
+            os.makedirs(self._results_dir, exist_ok=True)
+        done_digests = set()
+        with os.scandir(self._results_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                # The length check alone rules out most unrelated files, e.g. temporary ones
+                if (
+                    len(name) == RESULT_NAME_LENGTH
+                    and name[:RESULT_PREFIX_LEN] == RESULT_PREFIX
+                    and name[-RESULT_SUFFIX_LEN:] == RESULT_SUFFIX
+                ):
+                    try:
+                        done_digests.add(bytes.fromhex(name[RESULT_PREFIX_LEN:-RESULT_SUFFIX_LEN]))
+                    except ValueError:
+                        logger.debug(f"Ignoring unexpected result file {name}")
+
+        # Write to a private temporary file first so a partially written done set is never picked up.
+        # Concurrent rebuilds write the same digests, so whichever replace lands last is as good as any
+        tmp_path = f"{self._done_set_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(done_digests))
+            os.replace(tmp_path, self._done_set_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return done_digests
 
     async def populate_queue(self, work_paths: List[str], items_per_group: int) -> None:
         """
@@ -205,77 +528,55 @@ class LocalWorkQueue(WorkQueue):
         all_paths = set(work_paths)
         logger.info(f"Found {len(all_paths):,} total paths")
 
-        # Load existing work groups from local index
-        existing_lines = await asyncio.to_thread(download_zstd_csv_local, self._index_path)
-        existing_groups = {}
-        for line in existing_lines:
-            if line.strip():
-                parts = line.strip().split(",")
-                group_hash = parts[0]
-                group_paths = parts[1:]
-                existing_groups[group_hash] = group_paths
-
-        existing_path_set = {p for paths in existing_groups.values() for p in paths}
-        new_paths = all_paths - existing_path_set
+        # The index helpers are plain file I/O and need no context variables, so they are
+        # dispatched with run_in_executor rather than asyncio.to_thread, which copies the context
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._migrate_legacy_index)
+
+        # Drop the paths already present in the local index
+        new_paths = await loop.run_in_executor(None, self._discard_existing_paths, all_paths)
         logger.info(f"{len(new_paths):,} new paths to add to the workspace")
 
         if not new_paths:
             return
 
-        # Create new work groups
+        # Create new work groups as consecutive slices of the sorted paths, so each group is
+        # already sorted and is hashed without sorting it again
+        sorted_paths = sorted(new_paths)
         new_groups = []
-        current_group = []
-        for path in sorted(new_paths):
-            current_group.append(path)
-            if len(current_group) == items_per_group:
-                group_hash = self._compute_workgroup_hash(current_group)
-                new_groups.append((group_hash, current_group))
-                current_group = []
-        if current_group:
-            group_hash = self._compute_workgroup_hash(current_group)
-            new_groups.append((group_hash, current_group))
+        for start in range(0, len(sorted_paths), items_per_group):
+            group_paths = sorted_paths[start : start + items_per_group]
+            new_groups.append((self._compute_sorted_workgroup_hash(group_paths), group_paths))
 
         logger.info(f"Created {len(new_groups):,} new work groups")
 
-        # Combine and save updated work groups
-        combined_groups = existing_groups.copy()
-        for group_hash, group_paths in new_groups:
-            combined_groups[group_hash] = group_paths
-
-        combined_lines = [",".join([group_hash] + group_paths) for group_hash, group_paths in combined_groups.items()]
-
-        if new_groups:
-            # Write the combined data back to disk in zstd CSV format
-            await asyncio.to_thread(upload_zstd_csv_local, self._index_path, combined_lines)
+        # Append only the new work groups to the index, existing groups are left untouched
+        await loop.run_in_executor(None, self._append_work_index, new_groups)
 
     async def initialize_queue(self) -> int:
         """
         Load the work queue from the local index file and initialize it for processing.
         Removes already completed work items and randomizes the order.
         """
-        # 1) Read the index
-        work_queue_lines = await asyncio.to_thread(download_zstd_csv_local, self._index_path)
-        work_queue = {parts[0]: parts[1:] for line in work_queue_lines if (parts := line.strip().split(",")) and line.strip()}
+        # 1) Read the index, see populate_queue for why run_in_executor is used
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._migrate_legacy_index)
+        work_queue = await loop.run_in_executor(None, self._read_work_index)
 
-        # 2) Determine which items are completed by scanning local results/*.jsonl
-        if not os.path.isdir(self._results_dir):
-            os.makedirs(self._results_dir, exist_ok=True)
-        done_work_items = [f for f in os.listdir(self._results_dir) if f.startswith("output_") and f.endswith(".jsonl")]
-        done_work_hashes = {fn[len("output_") : -len(".jsonl")] for fn in done_work_items}
+        # 2) Determine which items are completed from the done set (or results/*.jsonl)
+        done_digests = await loop.run_in_executor(None, self._read_done_digests)
 
-        # 3) Filter out completed items
-        remaining_work_hashes = set(work_queue) - done_work_hashes
-        remaining_items = [WorkItem(hash=hash_, work_paths=work_queue[hash_]) for hash_ in remaining_work_hashes]
+        # 3) Filter out completed items, copying the remaining groups out of the decompressed
+        # records so the records, and the completed groups in them, are freed
+        remaining_items = [bytes(packed_group) for digest, packed_group in work_queue.items() if digest not in done_digests]
         random.shuffle(remaining_items)
 
         # 4) Initialize our in-memory queue
-        self._queue = asyncio.Queue()
-        for item in remaining_items:
-            await self._queue.put(item)
+        self._queue = deque(remaining_items)
 
-        logger.info(f"Initialized local queue with {self._queue.qsize()} work items")
+        logger.info(f"Initialized local queue with {len(self._queue)} work items")
 
-        return self._queue.qsize()
+        return len(self._queue)
 
     async def is_completed(self, work_hash: str) -> bool:
         """
@@ -285,9 +586,97 @@ class LocalWorkQueue(WorkQueue):
         Args:
             work_hash: Hash of the work item to check
         """
-        output_file = os.path.join(self._results_dir, f"output_{work_hash}.jsonl")
+        return self._result_exists(work_hash)
+
+    def _result_exists(self, work_hash: str) -> bool:
+        """Synchronous check for output_{work_hash}.jsonl in the results directory"""
+        output_file = os.path.join(self._results_dir, f"{RESULT_PREFIX}{work_hash}{RESULT_SUFFIX}")
         return os.path.exists(output_file)
 
+    def _try_acquire(self, work_item: WorkItem, worker_lock_timeout_secs: int) -> bool:
+        """
+        Try to take the lock for a work item, runs on the I/O thread pool.
+
+        Returns:
+            True if the lock was taken, False if the item is completed or locked by another worker
+        """
+        # Check if work is already completed
+        if self._result_exists(work_item.hash):
+            logger.debug(f"Work item {work_item.hash} already completed, skipping")
+            return False
+
+        # Create our lock file atomically, this fails if another worker already holds it
+        lock_file = os.path.join(self._locks_dir, f"{RESULT_PREFIX}{work_item.hash}{RESULT_SUFFIX}")
+        try:
+            os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return True
+        except FileExistsError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to create lock file for {work_item.hash}: {e}")
+            return False
+
+        # Check modification time, both sides are wall-clock floats
+        try:
+            mtime = os.stat(lock_file).st_mtime
+        except FileNotFoundError:
+            # The lock was released in the meantime, which its holder does once the item is done
+            logger.debug(f"Work item {work_item.hash} was released by another worker, skipping")
+            return False
+
+        if time.time() - mtime <= worker_lock_timeout_secs:
+            # Lock is active, skip this work
+            logger.debug(f"Work item {work_item.hash} is locked by another worker, skipping")
+            return False
+
+        return self._reclaim_stale_lock(work_item, lock_file, worker_lock_timeout_secs)
+
+    def _reclaim_stale_lock(self, work_item: WorkItem, lock_file: str, worker_lock_timeout_secs: int) -> bool:
+        """
+        Take over a stale lock file, making sure only one worker can win.
+
+        Workers that found the lock stale serialize on a reclaim marker created with O_EXCL. The marker
+        holder checks the lock again and refreshes its modification time, so later reclaimers see it as
+        active. The lock file itself never goes away, so no other worker can create it in between.
+
+        Returns:
+            True if this worker now holds the lock, False otherwise
+        """
+        marker_file = f"{lock_file}.reclaim"
+        try:
+            os.close(os.open(marker_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            # Reclaiming takes a few syscalls, a marker older than the lock timeout was left by a crashed worker
+            try:
+                if time.time() - os.stat(marker_file).st_mtime > worker_lock_timeout_secs:
+                    os.remove(marker_file)
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Stale lock for {work_item.hash} is being taken over by another worker, skipping")
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to create reclaim marker for {work_item.hash}: {e}")
+            return False
+
+        try:
+            now = time.time()
+            try:
+                if now - os.stat(lock_file).st_mtime <= worker_lock_timeout_secs:
+                    logger.debug(f"Work item {work_item.hash} was taken over by another worker, skipping")
+                    return False
+            except FileNotFoundError:
+                logger.debug(f"Work item {work_item.hash} was released by another worker, skipping")
+                return False
+
+            logger.debug(f"Found stale lock for {work_item.hash}, taking work item")
+            os.utime(lock_file, (now, now))
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to refresh stale lock file for {work_item.hash}: {e}")
+            return False
+        finally:
+            os.remove(marker_file)
+
     async def get_work(self, worker_lock_timeout_secs: int = 1800) -> Optional[WorkItem]:
         """
         Get the next available work item that isn't completed or locked.
@@ -299,59 +688,53 @@ class LocalWorkQueue(WorkQueue):
         Returns:
             WorkItem if work is available, None if queue is empty
         """
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                work_item = self._queue.get_nowait()
-            except asyncio.QueueEmpty:
+                packed_group = self._queue.popleft()
+            except IndexError:
                 return None
+            work_item = WorkItem(*unpack_work_group(packed_group))
+
+            if await loop.run_in_executor(self._get_io_pool(), self._try_acquire, work_item, worker_lock_timeout_secs):
+                return work_item
 
-            # Check if work is already completed
-            if await self.is_completed(work_item.hash):
-                logger.debug(f"Work item {work_item.hash} already completed, skipping")
-                self._queue.task_done()
-                continue
-
-            # Check for worker lock
-            lock_file = os.path.join(self._locks_dir, f"output_{work_item.hash}.jsonl")
-            if os.path.exists(lock_file):
-                # Check modification time
-                mtime = datetime.datetime.fromtimestamp(os.path.getmtime(lock_file), datetime.timezone.utc)
-                if (datetime.datetime.now(datetime.timezone.utc) - mtime).total_seconds() > worker_lock_timeout_secs:
-                    # Lock is stale, we can take this work
-                    logger.debug(f"Found stale lock for {work_item.hash}, taking work item")
-                else:
-                    # Lock is active, skip this work
-                    logger.debug(f"Work item {work_item.hash} is locked by another worker, skipping")
-                    self._queue.task_done()
-                    continue
-
-            # Create our lock file (touch an empty file)
+    def _release(self, work_item: WorkItem) -> None:
+        """
+        Remove the lock file of a work item and record it in the done set, runs on the I/O thread pool.
+        """
+        lock_file = os.path.join(self._locks_dir, f"{RESULT_PREFIX}{work_item.hash}{RESULT_SUFFIX}")
+        if os.path.exists(lock_file):
             try:
-                with open(lock_file, "wb") as f:
-                    f.write(b"")
+                os.remove(lock_file)
             except Exception as e:
-                logger.warning(f"Failed to create lock file for {work_item.hash}: {e}")
-                self._queue.task_done()
-                continue
+                logger.warning(f"Failed to delete lock file for {work_item.hash}: {e}")
 
-            return work_item
+        # Record the item in the done set, a single O_APPEND write of one digest needs no locking.
+        # If the done set does not exist yet, the next initialize_queue rebuilds it from results/.
+        try:
+            fd = os.open(self._done_set_path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, bytes.fromhex(work_item.hash))
+            finally:
+                os.close(fd)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to record {work_item.hash} in done set: {e}")
 
     async def mark_done(self, work_item: WorkItem) -> None:
         """
-        Mark a work item as done by removing its lock file.
+        Mark a work item as done by removing its lock file and
+        recording its hash in the done set file.
 
         Args:
             work_item: The WorkItem to mark as done
         """
-        lock_file = os.path.join(self._locks_dir, f"output_{work_item.hash}.jsonl")
-        if os.path.exists(lock_file):
-            try:
-                os.remove(lock_file)
-            except Exception as e:
-                logger.warning(f"Failed to delete lock file for {work_item.hash}: {e}")
-        self._queue.task_done()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_io_pool(), self._release, work_item)
 
     @property
     def size(self) -> int:
         """Get current size of local work queue"""
-        return self._queue.qsize()
+        return len(self._queue)